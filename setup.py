@@ -1,4 +1,40 @@
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
+from setuptools.command.build_ext import build_ext
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+
+class optional_build_ext(build_ext):
+    """Build the C hashing kernel if possible; the pure-Python path is the fallback."""
+
+    def run(self):
+        try:
+            super().run()
+        except Exception as exc:
+            print(f"warning: skipping crypto_tree._core ({exc})")
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except Exception as exc:
+            print(f"warning: skipping {ext.name} ({exc})")
+
+
+ext_modules = []
+if cythonize is not None:
+    ext_modules = cythonize(
+        [
+            Extension(
+                "crypto_tree._core",
+                ["src/crypto_tree/_core.pyx"],
+                libraries=["crypto"],
+            )
+        ],
+        language_level=3,
+    )
 
 setup(
     name="crypto-tree",
@@ -11,6 +47,8 @@ setup(
     url="https://github.com/yourusername/crypto-tree",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    ext_modules=ext_modules,
+    cmdclass={"build_ext": optional_build_ext},
     python_requires=">=3.8",
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -27,6 +65,9 @@ setup(
     ],
     install_requires=[],
     extras_require={
+        "jit": [
+            "numba",
+        ],
         "dev": [
             "pytest",
             "black",
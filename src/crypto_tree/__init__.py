@@ -4,12 +4,13 @@ CryptoTree: A cryptographically secure, self-balancing AVL tree for blockchain t
 Enables O(log n) search, Merkle proofs, and on-chain integrity verification.
 """
 
-from .crypto_tree import CryptoBinaryTree
+from .crypto_tree import CryptoBinaryTree, proof_to_dict_list
 from .node import CryptoTreeNode
 
 __all__ = [
     "CryptoBinaryTree",
     "CryptoTreeNode",
+    "proof_to_dict_list",
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,114 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+C implementation of the node hashing kernel, using OpenSSL's SHA-256.
+
+Built by setup.py when Cython and the OpenSSL headers are available;
+crypto_tree falls back to the pure-Python path otherwise.
+"""
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_FromStringAndSize, PyBytes_GET_SIZE
+from libc.stdlib cimport free, malloc
+
+
+cdef extern from "openssl/evp.h" nogil:
+    ctypedef struct EVP_MD_CTX:
+        pass
+    ctypedef struct EVP_MD:
+        pass
+    ctypedef struct ENGINE:
+        pass
+    EVP_MD_CTX *EVP_MD_CTX_new()
+    void EVP_MD_CTX_free(EVP_MD_CTX *ctx)
+    const EVP_MD *EVP_sha256()
+    int EVP_DigestInit_ex(EVP_MD_CTX *ctx, const EVP_MD *type, ENGINE *impl)
+    int EVP_DigestUpdate(EVP_MD_CTX *ctx, const void *d, size_t cnt)
+    int EVP_DigestFinal_ex(EVP_MD_CTX *ctx, unsigned char *md, unsigned int *s)
+
+
+# Stand-in hash for a missing child (static storage is zero-initialized)
+cdef unsigned char ZERO32[32]
+
+
+def hash_rows(
+    list rows,
+    const int[:] left,
+    const int[:] right,
+    const signed char[:] height,
+    list tx_canon,
+    const unsigned char[:] hashes,
+):
+    """
+    Hash ``rows`` of a CryptoBinaryTree, returning their digests concatenated.
+
+    Each message is left_hash || right_hash || height (u32 LE) || tx_canon,
+    matching ``CryptoBinaryTree._hash_input``. The hashing loop runs without
+    the GIL, so disjoint row chunks can be hashed on parallel threads.
+    """
+    cdef Py_ssize_t n = len(rows)
+    if n == 0:
+        return b''
+
+    cdef Py_ssize_t k
+    cdef int i, child
+    cdef int ok = 1
+    cdef unsigned int h, size
+    cdef unsigned char le[4]
+    cdef bytes canon
+    cdef bytes out = PyBytes_FromStringAndSize(NULL, n * 32)
+    cdef unsigned char *dst = <unsigned char *>PyBytes_AS_STRING(out)
+
+    cdef int *idx = <int *>malloc(n * sizeof(int))
+    cdef const char **data = <const char **>malloc(n * sizeof(char *))
+    cdef size_t *lengths = <size_t *>malloc(n * sizeof(size_t))
+    cdef EVP_MD_CTX *ctx = EVP_MD_CTX_new()
+    cdef const EVP_MD *md = EVP_sha256()
+    try:
+        if idx == NULL or data == NULL or lengths == NULL or ctx == NULL:
+            raise MemoryError()
+        if md == NULL:
+            raise RuntimeError("OpenSSL SHA-256 is unavailable")
+
+        # Resolve Python objects up front; tx_canon keeps the bytes alive
+        for k in range(n):
+            idx[k] = rows[k]
+            canon = tx_canon[idx[k]]
+            data[k] = PyBytes_AS_STRING(canon)
+            lengths[k] = PyBytes_GET_SIZE(canon)
+
+        # Each EVP call returns 1 on success; stop at the first failure so
+        # a partially written ``out`` is never returned
+        with nogil:
+            for k in range(n):
+                i = idx[k]
+                ok = EVP_DigestInit_ex(ctx, md, NULL)
+
+                child = left[i]
+                if child >= 0:
+                    ok = ok and EVP_DigestUpdate(ctx, &hashes[child * 32], 32)
+                else:
+                    ok = ok and EVP_DigestUpdate(ctx, ZERO32, 32)
+                child = right[i]
+                if child >= 0:
+                    ok = ok and EVP_DigestUpdate(ctx, &hashes[child * 32], 32)
+                else:
+                    ok = ok and EVP_DigestUpdate(ctx, ZERO32, 32)
+
+                h = <unsigned int>height[i]
+                le[0] = h & 0xFF
+                le[1] = (h >> 8) & 0xFF
+                le[2] = (h >> 16) & 0xFF
+                le[3] = (h >> 24) & 0xFF
+                ok = ok and EVP_DigestUpdate(ctx, le, 4)
+
+                ok = ok and EVP_DigestUpdate(ctx, data[k], lengths[k])
+                ok = ok and EVP_DigestFinal_ex(ctx, dst + k * 32, &size)
+                if not ok:
+                    break
+        if not ok:
+            raise RuntimeError("OpenSSL SHA-256 failed")
+    finally:
+        EVP_MD_CTX_free(ctx)
+        free(idx)
+        free(data)
+        free(lengths)
+    return out
@@ -0,0 +1,61 @@
+"""
+Optional Numba acceleration for the integer-only parts of the tree.
+
+numba is imported and the kernels compiled on first use, not at import
+time; without numba installed the functions below run as plain Python.
+"""
+
+from typing import Callable, Optional
+
+_jit_build_balanced: Optional[Callable[..., int]] = None
+
+
+def build_balanced(left, right, height, lo, hi):
+    """
+    Link rows [lo, hi) into a median-split balanced tree, returning the root row.
+
+    Rows must already be in key order. Child indices (-1 for none) and
+    heights are written in place into ``left``, ``right`` and ``height``.
+    """
+    if lo >= hi:
+        return -1
+
+    root = (lo + hi) // 2
+    stack = [(lo, hi)]
+    while stack:
+        lo, hi = stack.pop()
+        mid = (lo + hi) // 2
+
+        # A median-split subtree of m rows has height bit_length(m)
+        h = 0
+        m = hi - lo
+        while m:
+            h += 1
+            m >>= 1
+        height[mid] = h
+
+        if lo < mid:
+            left[mid] = (lo + mid) // 2
+            stack.append((lo, mid))
+        else:
+            left[mid] = -1
+        if mid + 1 < hi:
+            right[mid] = (mid + 1 + hi) // 2
+            stack.append((mid + 1, hi))
+        else:
+            right[mid] = -1
+
+    return root
+
+
+def jit_build_balanced() -> Callable[..., int]:
+    """Return ``build_balanced`` compiled by numba, or unchanged without numba."""
+    global _jit_build_balanced
+    if _jit_build_balanced is None:
+        try:
+            from numba import njit  # type: ignore[import-not-found]
+        except ImportError:  # numba is an optional dependency
+            _jit_build_balanced = build_balanced
+        else:
+            _jit_build_balanced = njit(cache=True)(build_balanced)
+    return _jit_build_balanced
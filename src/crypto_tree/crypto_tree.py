@@ -1,25 +1,79 @@
 import hashlib
-import json
-from typing import Optional, Dict, Any, List, Tuple
-from .node import CryptoTreeNode
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
+from ._jit import build_balanced, jit_build_balanced
+from .node import NULL, ZERO32, CryptoTreeNode, canonical_tx, sha256_batch
+
+try:
+    from ._core import hash_rows  # type: ignore[import-not-found]
+except ImportError:  # C extension not built; use the pure-Python path
+    hash_rows = None
+
+# (sides bitmask, concatenated 32-byte sibling hashes), root to target
+Proof = Tuple[int, bytes]
+
+# Smallest level worth splitting across worker threads
+PARALLEL_MIN_LEVEL = 256
+
+# Smallest bulk build worth importing numba and compiling build_balanced for
+JIT_MIN_BATCH = 500_000
+
+def proof_to_dict_list(sides: int, hashes: bytes) -> List[Dict[str, str]]:
+    """Expand a compact proof into [{"side": "left|right", "hash": "<hex>"}, ...]."""
+    return [
+        {
+            "side": "left" if sides >> i & 1 else "right",
+            "hash": hashes[i * 32:(i + 1) * 32].hex(),
+        }
+        for i in range(len(hashes) // 32)
+    ]
 
 class CryptoBinaryTree:
     """
     A self-balancing AVL tree for cryptographic transaction indexing.
     
     Supports:
-    - O(log n) insertion and search
+    - O(log n) insertion, O(1) exact-id search via a hash index
     - Merkle root commitment
     - Cryptographic inclusion proofs
     - Full tree integrity verification
     
     Unlike BST, this uses AVL rotations to guarantee O(log n) worst-case performance.
+    
+    Nodes are stored as parallel arrays (struct-of-arrays) and referenced
+    by row index, with ``NULL`` (-1) for a missing child. Tree walks only
+    touch the compact ``_keys``/``_left``/``_right``/``_height`` columns;
+    ``CryptoTreeNode`` views wrap a row for the public API.
     """
     
     def __init__(self):
-        self.root: Optional[CryptoTreeNode] = None
-        self.size = 0
         self.merkle_root = "0"
+        self._root = NULL
+        
+        # One row per node
+        self._keys: List[Any] = []
+        self._tx: List[Dict[str, Any]] = []
+        self._tx_canon: List[bytes] = []
+        self._left = array('i')
+        self._right = array('i')
+        self._height = array('b')
+        self._hashes = bytearray()  # 32 bytes per row, contiguous
+        
+        # Exact-id lookups; the tree itself only orders the Merkle commitment
+        self._index: Dict[Any, int] = {}
+        # Inclusion proofs already served, dropped on every mutation
+        self._proof_cache: Dict[Any, Proof] = {}
+    
+    @property
+    def size(self) -> int:
+        """Number of transactions in the tree."""
+        return len(self._keys)
+    
+    @property
+    def root(self) -> Optional[CryptoTreeNode]:
+        """View of the root node, or None for an empty tree."""
+        return CryptoTreeNode._view(self, self._root) if self._root != NULL else None
     
     def insert(self, transaction: Dict[str, Any]) -> bool:
         """
@@ -30,210 +84,371 @@ class CryptoBinaryTree:
         if not isinstance(transaction, dict) or 'id' not in transaction:
             raise ValueError("Transaction must be a dict with 'id' field")
         
-        if not self.root:
-            self.root = CryptoTreeNode(transaction)
-            self.size = 1
-            self._update_merkle_root()
-            return True
-        
-        # Insert recursively and balance
-        inserted = self._insert_recursive(self.root, transaction)
-        if inserted:
-            self.size += 1
-            self._update_merkle_root()
-        return inserted
-    
-    def _insert_recursive(self, node: CryptoTreeNode, transaction: Dict[str, Any]) -> bool:
+        # Avoid duplicates without walking the tree
         tx_id = transaction['id']
-        node_tx_id = node.transaction['id']
-        
-        # Avoid duplicates
-        if tx_id == node_tx_id:
+        if tx_id in self._index:
             return False
         
-        # Insert into left subtree
-        if tx_id < node_tx_id:
-            if node.left is None:
-                node.left = CryptoTreeNode(transaction)
-                node.update_hash()
-                self._update_height(node)
-                self._balance_node(node)
-                return True
-            else:
-                inserted = self._insert_recursive(node.left, transaction)
-                if inserted:
-                    node.update_hash()
-                    self._update_height(node)
-                    self._balance_node(node)
-                return inserted
-        
-        # Insert into right subtree
-        elif tx_id > node_tx_id:
-            if node.right is None:
-                node.right = CryptoTreeNode(transaction)
-                node.update_hash()
-                self._update_height(node)
-                self._balance_node(node)
-                return True
+        # Walk down, recording the ancestor path
+        keys, left, right = self._keys, self._left, self._right
+        path: List[int] = []
+        i = self._root
+        while i != NULL:
+            path.append(i)
+            i = left[i] if tx_id < keys[i] else right[i]
+        
+        new = self._append(transaction, canonical_tx(transaction))
+        self._index[tx_id] = new
+        if not path:
+            self._root = new
+        elif tx_id < keys[path[-1]]:
+            left[path[-1]] = new
+        else:
+            right[path[-1]] = new
+        
+        # Unwind bottom-up, rebalancing and relinking each subtree root.
+        # Heights and balance factors are read inline; this is the hot loop.
+        height = self._height
+        for pos in range(len(path) - 1, -1, -1):
+            i = path[pos]
+            lc, rc = left[i], right[i]
+            left_height = height[lc] if lc != NULL else 0
+            right_height = height[rc] if rc != NULL else 0
+            if -1 <= left_height - right_height <= 1:
+                new_height = max(left_height, right_height) + 1
+                if height[i] == new_height:
+                    # Subtree height unchanged, so no ancestor can be unbalanced
+                    break
+                height[i] = new_height
+                continue
+            
+            subtree = self._balance_node(i)
+            if pos == 0:
+                self._root = subtree
+            elif left[path[pos - 1]] == i:
+                left[path[pos - 1]] = subtree
             else:
-                inserted = self._insert_recursive(node.right, transaction)
-                if inserted:
-                    node.update_hash()
-                    self._update_height(node)
-                    self._balance_node(node)
-                return inserted
+                right[path[pos - 1]] = subtree
+            # A rotation restores the subtree's height from before the insert
+            break
+        
+        # Hash once per touched node now that the structure has settled.
+        # Rotations only rearrange nodes on the insert path. The path holds
+        # about one node per level, too few for level batching to pay off,
+        # so hash it directly, lowest node first.
+        path.append(new)
+        path.sort(key=self._height.__getitem__)
+        sha256, tx_canon = hashlib.sha256, self._tx_canon
+        with memoryview(self._hashes) as hashes:
+            for i in path:
+                # Inlined _hash_input
+                lc, rc = left[i], right[i]
+                hashes[i * 32:i * 32 + 32] = sha256(b''.join((
+                    hashes[lc * 32:lc * 32 + 32] if lc != NULL else ZERO32,
+                    hashes[rc * 32:rc * 32 + 32] if rc != NULL else ZERO32,
+                    height[i].to_bytes(4, 'little'),
+                    tx_canon[i],
+                ))).digest()
         
-        return False
+        self._proof_cache.clear()
+        self._update_merkle_root()
+        return True
     
-    def _update_height(self, node: CryptoTreeNode):
-        """Update height of node based on children."""
-        left_height = node.left.height if node.left else 0
-        right_height = node.right.height if node.right else 0
-        node.height = max(left_height, right_height) + 1
+    def insert_many(self, transactions: List[Dict[str, Any]], workers: int = 1) -> int:
+        """
+        Insert a batch of transactions. Returns the number inserted.
+        
+        On an empty tree the batch is deduplicated (first occurrence wins),
+        sorted by id and built directly into a perfectly balanced tree in
+        O(n) with no rotations, then hashed in a single bottom-up pass,
+        spread over ``workers`` threads (see ``verify_integrity``).
+        On a non-empty tree this falls back to per-item ``insert``.
+        """
+        for transaction in transactions:
+            if not isinstance(transaction, dict) or 'id' not in transaction:
+                raise ValueError("Transaction must be a dict with 'id' field")
+        
+        if self._root != NULL:
+            return sum(self.insert(transaction) for transaction in transactions)
+        
+        unique: Dict[Any, Dict[str, Any]] = {}
+        for transaction in transactions:
+            unique.setdefault(transaction['id'], transaction)
+        if not unique:
+            return 0
+        
+        # Serialize the whole batch first so a bad transaction leaves no rows behind
+        ordered = [unique[tx_id] for tx_id in sorted(unique)]
+        canons = [canonical_tx(transaction) for transaction in ordered]
+        
+        # Rows are appended in key order, so row i is the i-th smallest id
+        rows = [self._append(tx, canon) for tx, canon in zip(ordered, canons)]
+        build = jit_build_balanced() if len(rows) >= JIT_MIN_BATCH else build_balanced
+        self._root = build(self._left, self._right, self._height, 0, len(rows))
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        self._rehash(rows, workers)
+        
+        self._proof_cache.clear()
+        self._update_merkle_root()
+        return len(rows)
+    
+    def _append(self, transaction: Dict[str, Any], canon: bytes) -> int:
+        """
+        Add a detached leaf row and return its index. Its hash is left for ``_rehash``.
+        
+        ``canon`` must already be serialized so nothing can fail between
+        the column appends and leave the columns with different lengths.
+        """
+        self._keys.append(transaction['id'])
+        self._tx.append(transaction)
+        self._tx_canon.append(canon)
+        self._left.append(NULL)
+        self._right.append(NULL)
+        self._height.append(1)
+        self._hashes += ZERO32
+        return len(self._keys) - 1
     
-    def _balance_node(self, node: CryptoTreeNode):
-        """Balance the node using AVL rotations if needed."""
-        balance = node.get_balance_factor()
+    def _hash_at(self, i: int) -> bytes:
+        """Stored hash of row i."""
+        return bytes(self._hashes[i * 32:i * 32 + 32])
+    
+    def _hash_input(self, i: int, hashes: Optional[memoryview] = None) -> bytes:
+        """
+        Build the message hashed for row i:
+        left_hash (32 bytes) || right_hash (32 bytes) ||
+        height (u32 LE) || canonical tx JSON
+        
+        Bulk callers pass a memoryview of ``_hashes`` so the child digests
+        are joined straight from the hash column without intermediate copies.
+        """
+        if hashes is None:
+            hashes = memoryview(self._hashes)
+        left, right = self._left[i], self._right[i]
+        return b''.join((
+            hashes[left * 32:left * 32 + 32] if left != NULL else ZERO32,
+            hashes[right * 32:right * 32 + 32] if right != NULL else ZERO32,
+            self._height[i].to_bytes(4, 'little'),
+            self._tx_canon[i],
+        ))
+    
+    def _levels(self, rows: Iterable[int]) -> List[List[int]]:
+        """Group rows by height, lowest level first."""
+        height = self._height
+        levels: Dict[int, List[int]] = {}
+        for i in rows:
+            levels.setdefault(height[i], []).append(i)
+        return [levels[h] for h in sorted(levels)]
+    
+    def _hash_level(
+        self,
+        level: List[int],
+        hashes: memoryview,
+        pool: Optional[Executor] = None,
+        workers: int = 1,
+    ) -> bytes:
+        """
+        Hash one level of independent rows, returning their digests concatenated.
+        
+        Large levels are split into row chunks across ``pool``.
+        """
+        if pool is None or len(level) < PARALLEL_MIN_LEVEL:
+            return self._hash_rows(level, hashes)
+        
+        size = -(-len(level) // workers)
+        chunks = [level[k:k + size] for k in range(0, len(level), size)]
+        return b''.join(pool.map(lambda chunk: self._hash_rows(chunk, hashes), chunks))
+    
+    def _hash_rows(self, rows: List[int], hashes: memoryview) -> bytes:
+        """Hash the given rows, using the C kernel when it is built."""
+        if hash_rows is not None:
+            return hash_rows(
+                rows, self._left, self._right, self._height, self._tx_canon, hashes
+            )
+        return b''.join(sha256_batch([self._hash_input(i, hashes) for i in rows]))
+    
+    def _rehash(self, rows: List[int], workers: int = 1):
+        """
+        Recompute hashes of the given rows, children before parents.
+        
+        Callers pass every row whose children or height changed. A child is
+        always strictly lower than its parent, so rows of equal height are
+        independent of each other and each level is hashed as one batch,
+        lowest level first.
+        """
+        pool = ThreadPoolExecutor(workers) if workers > 1 else None
+        try:
+            with memoryview(self._hashes) as hashes:
+                for level in self._levels(rows):
+                    digests = self._hash_level(level, hashes, pool, workers)
+                    for k, i in enumerate(level):
+                        hashes[i * 32:i * 32 + 32] = digests[k * 32:k * 32 + 32]
+        finally:
+            if pool:
+                pool.shutdown()
+    
+    def _update_height(self, i: int):
+        """Update height of row i based on children."""
+        height = self._height
+        left, right = self._left[i], self._right[i]
+        left_height = height[left] if left != NULL else 0
+        right_height = height[right] if right != NULL else 0
+        height[i] = max(left_height, right_height) + 1
+    
+    def _balance_factor(self, i: int) -> int:
+        """Calculate balance factor of row i."""
+        height = self._height
+        left, right = self._left[i], self._right[i]
+        left_height = height[left] if left != NULL else 0
+        right_height = height[right] if right != NULL else 0
+        return left_height - right_height
+    
+    def _balance_node(self, i: int) -> int:
+        """
+        Balance row i using AVL rotations if needed.
+        
+        Returns the root of the balanced subtree; callers must relink it
+        into the parent (or the tree root).
+        """
+        balance = self._balance_factor(i)
         
         # Left heavy
         if balance > 1:
-            if node.left and node.left.get_balance_factor() < 0:
+            if self._balance_factor(self._left[i]) < 0:
                 # Left-Right case
-                node.left = self._rotate_left(node.left)
+                self._left[i] = self._rotate_left(self._left[i])
             # Left-Left case
-            node = self._rotate_right(node)
+            i = self._rotate_right(i)
         
         # Right heavy
         elif balance < -1:
-            if node.right and node.right.get_balance_factor() > 0:
+            if self._balance_factor(self._right[i]) > 0:
                 # Right-Left case
-                node.right = self._rotate_right(node.right)
+                self._right[i] = self._rotate_right(self._right[i])
             # Right-Right case
-            node = self._rotate_left(node)
+            i = self._rotate_left(i)
         
-        return node
+        return i
     
-    def _rotate_left(self, z: CryptoTreeNode) -> CryptoTreeNode:
-        """Perform left rotation on node z."""
-        y = z.right
-        T2 = y.left
+    def _rotate_left(self, z: int) -> int:
+        """Perform left rotation on row z."""
+        left, right = self._left, self._right
+        y = right[z]
+        T2 = left[y]
         
         # Perform rotation
-        y.left = z
-        z.right = T2
+        left[y] = z
+        right[z] = T2
         
-        # Update heights
+        # Update heights; hashes are recomputed once the insert path has settled
         self._update_height(z)
         self._update_height(y)
         
-        # Update hashes
-        z.update_hash()
-        y.update_hash()
-        
         return y
     
-    def _rotate_right(self, z: CryptoTreeNode) -> CryptoTreeNode:
-        """Perform right rotation on node z."""
-        y = z.left
-        T3 = y.right
+    def _rotate_right(self, z: int) -> int:
+        """Perform right rotation on row z."""
+        left, right = self._left, self._right
+        y = left[z]
+        T3 = right[y]
         
         # Perform rotation
-        y.right = z
-        z.left = T3
+        right[y] = z
+        left[z] = T3
         
-        # Update heights
+        # Update heights; hashes are recomputed once the insert path has settled
         self._update_height(z)
         self._update_height(y)
         
-        # Update hashes
-        z.update_hash()
-        y.update_hash()
-        
         return y
     
     def search(self, tx_id: str) -> Optional[Dict[str, Any]]:
         """
         Search for a transaction by ID. Returns transaction data or None.
-        Time complexity: O(log n)
+        Time complexity: O(1) via the hash index
         """
-        return self._search_recursive(self.root, tx_id)
+        i = self._index.get(tx_id)
+        return self._tx[i] if i is not None else None
     
-    def _search_recursive(self, node: Optional[CryptoTreeNode], tx_id: str) -> Optional[Dict[str, Any]]:
-        if not node:
-            return None
-        
-        node_tx_id = node.transaction['id']
-        
-        if tx_id == node_tx_id:
-            return node.transaction
-        elif tx_id < node_tx_id:
-            return self._search_recursive(node.left, tx_id)
-        else:
-            return self._search_recursive(node.right, tx_id)
-    
-    def verify_integrity(self) -> bool:
+    def verify_integrity(self, workers: int = 1) -> bool:
         """
         Verify the entire tree's cryptographic integrity.
         Returns True if all hashes are valid.
-        """
-        return self._verify_recursive(self.root)
-    
-    def _verify_recursive(self, node: Optional[CryptoTreeNode]) -> bool:
-        if not node:
-            return True
         
-        # Recompute hash and compare
-        expected_hash = node.calculate_hash()
-        if node.hash != expected_hash:
-            print(f"❌ Hash mismatch at transaction {node.transaction['id']}")
-            return False
+        Each node is checked against its children's stored hashes, so all
+        checks are independent: every level is recomputed with one batch
+        call and compared against the stored hash column in one go.
         
-        # Recursively verify children
-        return (self._verify_recursive(node.left) and 
-                self._verify_recursive(node.right))
+        With ``workers > 1`` large levels are hashed on a thread pool.
+        CPython's hashlib only releases the GIL for inputs of 2 KiB or
+        more, so this pays off for large transactions (or free-threaded
+        builds); workers beyond the number of physical cores only add
+        overhead.
+        """
+        pool = ThreadPoolExecutor(workers) if workers > 1 else None
+        try:
+            with memoryview(self._hashes) as hashes:
+                for level in self._levels(range(len(self._keys))):
+                    digests = self._hash_level(level, hashes, pool, workers)
+                    stored = [hashes[i * 32:i * 32 + 32] for i in level]
+                    if digests == b''.join(stored):
+                        continue
+                    
+                    for k, (i, expected) in enumerate(zip(level, stored)):
+                        if digests[k * 32:k * 32 + 32] != expected:
+                            print(f"❌ Hash mismatch at transaction {self._keys[i]}")
+                            return False
+        finally:
+            if pool:
+                pool.shutdown()
+        return True
     
     def _update_merkle_root(self):
         """Update the Merkle root to be the hash of the root node."""
-        self.merkle_root = self.root.hash if self.root else "0"
+        root = self._root
+        self.merkle_root = self._hash_at(root).hex() if root != NULL else "0"
     
-    def get_proof_of_inclusion(self, tx_id: str) -> Optional[List[Dict[str, str]]]:
+    def get_proof_of_inclusion(
+        self, tx_id: str, as_dicts: bool = False
+    ) -> Optional[Union[Proof, List[Dict[str, str]]]]:
         """
         Get a cryptographic proof that a transaction exists in the tree.
         
-        Returns a list of {"side": "left|right", "hash": "..."} objects
-        that can be used to reconstruct the path from root to target.
+        Returns ``(sides, hashes)`` ordered from root to target: ``hashes``
+        concatenates one raw 32-byte sibling digest per level (``ZERO32``
+        for a missing sibling) and bit i of ``sides`` is set when sibling i
+        is a left child. With ``as_dicts=True``
+        returns the legacy list of {"side": "left|right", "hash": "..."}
+        objects instead (see ``proof_to_dict_list``).
         
         This enables light clients to verify inclusion without the full tree.
         """
-        proof = []
-        found = self._get_proof_recursive(self.root, tx_id, proof)
-        return proof if found else None
-    
-    def _get_proof_recursive(
-        self, 
-        node: Optional[CryptoTreeNode], 
-        tx_id: str, 
-        proof: List[Dict[str, str]]
-    ) -> bool:
-        if not node:
-            return False
-        
-        node_tx_id = node.transaction['id']
-        
-        if tx_id == node_tx_id:
-            return True
-        
-        # Go left
-        if tx_id < node_tx_id:
-            if node.right:
-                proof.append({"side": "right", "hash": node.right.hash})
-            return self._get_proof_recursive(node.left, tx_id, proof)
+        if tx_id not in self._index:
+            return None
         
-        # Go right
-        else:
-            if node.left:
-                proof.append({"side": "left", "hash": node.left.hash})
-            return self._get_proof_recursive(node.right, tx_id, proof)
+        # Memoized per id until the next mutation
+        proof = self._proof_cache.get(tx_id)
+        if proof is None:
+            proof = self._proof_cache[tx_id] = self._build_proof(tx_id)
+        return proof_to_dict_list(*proof) if as_dicts else proof
+    
+    def _build_proof(self, tx_id: Any) -> Proof:
+        """Collect the sibling hashes on the path from the root to ``tx_id``."""
+        keys, left, right = self._keys, self._left, self._right
+        sides = 0
+        hashes: List[bytes] = []
+        i = self._root
+        while keys[i] != tx_id:
+            if tx_id < keys[i]:
+                # Right sibling: bit stays clear
+                i, sibling = left[i], right[i]
+            else:
+                sides |= 1 << len(hashes)
+                i, sibling = right[i], left[i]
+            hashes.append(self._hash_at(sibling) if sibling != NULL else ZERO32)
+        return sides, b''.join(hashes)
+    
+    def __contains__(self, tx_id: Any) -> bool:
+        return tx_id in self._index
     
     def __len__(self):
         return self.size
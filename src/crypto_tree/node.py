@@ -2,6 +2,28 @@ import hashlib
 import json
 from typing import Optional, Dict, Any, List
 
+# Stand-in hash for a missing child
+ZERO32 = bytes(32)
+# Missing child in the tree's index arrays
+NULL = -1
+
+# Shared encoder: json.dumps with non-default options builds a new one per call
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+def canonical_tx(transaction_data: Dict[str, Any]) -> bytes:
+    """Serialize a transaction deterministically (sorted keys, no whitespace)."""
+    return _CANONICAL_JSON.encode(transaction_data).encode('utf-8')
+
+def sha256_batch(messages: List[bytes]) -> List[bytes]:
+    """
+    Hash a batch of independent messages, returning raw digests in order.
+    
+    All bulk rehashing goes through here so a multi-buffer SHA-256 backend
+    can be dropped in without touching the tree code.
+    """
+    sha256 = hashlib.sha256
+    return [sha256(message).digest() for message in messages]
+
 class CryptoTreeNode:
     """
     A cryptographic node in the AVL tree, storing a transaction and its Merkle hash.
@@ -13,49 +35,98 @@ class CryptoTreeNode:
     - height (for AVL balancing)
     
     This ensures tamper-evident structure.
+    
+    Node fields are stored column-wise inside the owning CryptoBinaryTree;
+    a CryptoTreeNode is a lightweight view of one row. Constructing one
+    directly creates a detached single-node tree.
     """
     
+    __slots__ = ('_tree', '_i')
+    
     def __init__(self, transaction_data: Dict[str, Any]):
-        if not isinstance(transaction_data, dict) or 'id' not in transaction_data:
-            raise ValueError("Transaction must be a dict with 'id' field")
+        from .crypto_tree import CryptoBinaryTree  # Avoid circular import
         
-        self.transaction = transaction_data
-        self.timestamp = transaction_data.get('timestamp')
-        self.left: Optional['CryptoTreeNode'] = None
-        self.right: Optional['CryptoTreeNode'] = None
-        self.height = 1  # Height for AVL balancing
-        self.hash = self.calculate_hash()
-    
-    def calculate_hash(self) -> str:
+        tree = CryptoBinaryTree()
+        tree.insert(transaction_data)
+        self._tree = tree
+        self._i = tree._root
+    
+    @classmethod
+    def _view(cls, tree: Any, i: int) -> 'CryptoTreeNode':
+        """Wrap row ``i`` of ``tree`` without copying."""
+        node = cls.__new__(cls)
+        node._tree = tree
+        node._i = i
+        return node
+    
+    def _child(self, i: int) -> Optional['CryptoTreeNode']:
+        return CryptoTreeNode._view(self._tree, i) if i != NULL else None
+    
+    @property
+    def transaction(self) -> Dict[str, Any]:
+        return self._tree._tx[self._i]
+    
+    @property
+    def key(self) -> Any:
+        return self._tree._keys[self._i]
+    
+    @property
+    def timestamp(self) -> Optional[Any]:
+        """Read from the transaction; not stored separately."""
+        return self.transaction.get('timestamp')
+    
+    @property
+    def left(self) -> Optional['CryptoTreeNode']:
+        return self._child(self._tree._left[self._i])
+    
+    @property
+    def right(self) -> Optional['CryptoTreeNode']:
+        return self._child(self._tree._right[self._i])
+    
+    @property
+    def height(self) -> int:
+        return self._tree._height[self._i]
+    
+    @property
+    def hash(self) -> bytes:
+        return self._tree._hash_at(self._i)
+    
+    @property
+    def hex_hash(self) -> str:
+        """Hex-encoded hash, for display and proof output."""
+        return self.hash.hex()
+    
+    def hash_input(self) -> bytes:
         """
-        Calculate cryptographic hash using CBOR-like deterministic serialization.
+        Build the message hashed for this node.
         
-        Uses sorted keys and canonical JSON to ensure deterministic output.
+        Uses a fixed binary layout:
+        left_hash (32 bytes) || right_hash (32 bytes) ||
+        height (u32 LE) || canonical tx JSON
         """
-        left_hash = self.left.hash if self.left else "0"
-        right_hash = self.right.hash if self.right else "0"
-        
-        # Create deterministic dict with all fields
-        node_data = {
-            'transaction': self.transaction,
-            'left_hash': left_hash,
-            'right_hash': right_hash,
-            'height': self.height
-        }
-        
-        # Serialize with sorted keys for determinism
-        data_string = json.dumps(node_data, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(data_string.encode('utf-8')).hexdigest()
+        return self._tree._hash_input(self._i)
+    
+    def calculate_hash(self) -> bytes:
+        """Calculate the raw SHA-256 digest of the node."""
+        return hashlib.sha256(self.hash_input()).digest()
     
     def update_hash(self):
         """Recompute hash after child modifications."""
-        self.hash = self.calculate_hash()
+        self._tree._rehash([self._i])
     
     def get_balance_factor(self) -> int:
         """Calculate balance factor for AVL tree."""
-        left_height = self.left.height if self.left else 0
-        right_height = self.right.height if self.right else 0
-        return left_height - right_height
+        return self._tree._balance_factor(self._i)
+    
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, CryptoTreeNode)
+            and other._tree is self._tree
+            and other._i == self._i
+        )
+    
+    def __hash__(self) -> int:
+        return hash((id(self._tree), self._i))
     
     def __repr__(self):
-        return f"CryptoTreeNode(id={self.transaction['id']}, hash={self.hash[:8]})"
\ No newline at end of file
+        return f"CryptoTreeNode(id={self.key}, hash={self.hex_hash[:8]})"
@@ -1,6 +1,8 @@
+import hashlib
+import math
 import unittest
 import random
-from src.crypto_tree import CryptoBinaryTree, CryptoTreeNode
+from src.crypto_tree import CryptoBinaryTree, CryptoTreeNode, proof_to_dict_list
 
 class TestCryptoTree(unittest.TestCase):
     
@@ -24,6 +26,30 @@ class TestCryptoTree(unittest.TestCase):
         self.tree.insert(tx)
         self.assertIsNone(self.tree.search("tx_999"))
     
+    def test_contains(self):
+        tx = {"id": "tx_001", "from": "Alice", "to": "Bob", "amount": 100}
+        self.tree.insert(tx)
+        self.assertIn("tx_001", self.tree)
+        self.assertNotIn("tx_999", self.tree)
+        self.assertIsNone(self.tree.get_proof_of_inclusion("tx_999"))
+    
+    def test_failed_insert_leaves_tree_usable(self):
+        self.tree.insert({"id": "a", "amount": 1})
+        with self.assertRaises(TypeError):
+            self.tree.insert({"id": "b", "x": {1, 2}})  # Not JSON-serializable
+        self.assertEqual(len(self.tree), 1)
+        
+        self.assertTrue(self.tree.insert({"id": "c", "amount": 3}))
+        self.assertEqual(len(self.tree), 2)
+        self.assertTrue(self.tree.verify_integrity())
+        
+        bulk = CryptoBinaryTree()
+        with self.assertRaises(TypeError):
+            bulk.insert_many([{"id": "a"}, {"id": "b", "x": {1, 2}}])
+        self.assertEqual(len(bulk), 0)
+        self.assertEqual(bulk.insert_many([{"id": "c"}, {"id": "d"}]), 2)
+        self.assertTrue(bulk.verify_integrity())
+    
     def test_integrity_after_insert(self):
         transactions = [
             {"id": "tx_003", "from": "Bob", "to": "Charlie", "amount": 50},
@@ -36,6 +62,25 @@ class TestCryptoTree(unittest.TestCase):
         
         self.assertTrue(self.tree.verify_integrity())
     
+    def test_integrity_random_order(self):
+        rng = random.Random(6)
+        for n in range(2, 40):
+            tree = CryptoBinaryTree()
+            ids = list(range(n))
+            rng.shuffle(ids)
+            for i in ids:
+                tree.insert({"id": f"tx_{i:03d}", "amount": i})
+                self.assertTrue(tree.verify_integrity())
+    
+    def test_tamper_detected(self):
+        for i in range(50):
+            self.tree.insert({"id": f"tx_{i:03d}", "amount": i})
+        self.assertTrue(self.tree.verify_integrity())
+        
+        leaf = self.tree._index["tx_000"]
+        self.tree._hashes[leaf * 32] ^= 0xFF
+        self.assertFalse(self.tree.verify_integrity())
+    
     def test_proof_of_inclusion(self):
         transactions = [
             {"id": "tx_005", "from": "Alice", "to": "Bob", "amount": 100},
@@ -48,7 +93,7 @@ class TestCryptoTree(unittest.TestCase):
         for tx in transactions:
             self.tree.insert(tx)
         
-        proof = self.tree.get_proof_of_inclusion("tx_003")
+        proof = self.tree.get_proof_of_inclusion("tx_003", as_dicts=True)
         self.assertIsNotNone(proof)
         self.assertGreater(len(proof), 0)
         
@@ -59,6 +104,71 @@ class TestCryptoTree(unittest.TestCase):
             self.assertIsInstance(item["hash"], str)
             self.assertEqual(len(item["hash"]), 64)  # SHA-256
     
+    def test_binary_hash_layout(self):
+        tx = {"id": "tx_001", "from": "Alice", "to": "Bob", "amount": 100}
+        node = CryptoTreeNode(tx)
+        self.assertIsInstance(node.hash, bytes)
+        self.assertEqual(len(node.hash), 32)
+        
+        self.assertFalse(hasattr(node, "__dict__"))  # Slotted node
+        
+        self.tree.insert(tx)
+        self.assertEqual(self.tree.merkle_root, node.hex_hash)
+        self.assertEqual(len(self.tree.merkle_root), 64)
+    
+    def test_proof_refreshed_after_insert(self):
+        self.tree.insert({"id": "tx_002", "amount": 2})
+        self.tree.insert({"id": "tx_001", "amount": 1})
+        self.assertEqual(self.tree.get_proof_of_inclusion("tx_001"), (0, bytes(32)))
+        
+        self.tree.insert({"id": "tx_003", "amount": 3})
+        sides, hashes = self.tree.get_proof_of_inclusion("tx_001")
+        self.assertEqual(sides, 0)  # Sibling is a right child
+        self.assertEqual(hashes, self.tree.root.right.hash)
+        
+        sides, hashes = self.tree.get_proof_of_inclusion("tx_003")
+        self.assertEqual(sides, 1)  # Sibling is a left child
+        self.assertEqual(hashes, self.tree.root.left.hash)
+        self.assertEqual(
+            proof_to_dict_list(sides, hashes),
+            [{"side": "left", "hash": self.tree.root.left.hex_hash}],
+        )
+    
+    def test_proof_verifies_against_root(self):
+        for i in random.sample(range(200), 200):
+            self.tree.insert({"id": f"tx_{i:03d}", "amount": i})
+        tree = self.tree
+        
+        def node_hash(left, right, height, tx_canon):
+            message = left + right + height.to_bytes(4, "little") + tx_canon
+            return hashlib.sha256(message).digest()
+        
+        for i in range(200):
+            tx_id = f"tx_{i:03d}"
+            sides, hashes = tree.get_proof_of_inclusion(tx_id)
+            
+            # Heights and transactions of the path nodes, root first
+            path, row = [], tree._root
+            while True:
+                path.append((tree._height[row], tree._tx_canon[row]))
+                if tree._keys[row] == tx_id:
+                    break
+                row = tree._left[row] if tx_id < tree._keys[row] else tree._right[row]
+            self.assertEqual(len(hashes), 32 * (len(path) - 1))
+            
+            left = tree._left[row]
+            right = tree._right[row]
+            current = node_hash(
+                tree._hash_at(left) if left != -1 else bytes(32),
+                tree._hash_at(right) if right != -1 else bytes(32),
+                *path[-1],
+            )
+            for k in range(len(path) - 2, -1, -1):
+                sibling = hashes[k * 32:(k + 1) * 32]
+                pair = (sibling, current) if sides >> k & 1 else (current, sibling)
+                current = node_hash(*pair, *path[k])
+            self.assertEqual(current.hex(), tree.merkle_root)
+    
     def test_large_tree_integrity(self):
         # Test with 1000 transactions
         transactions = [{"id": f"tx_{i:04d}", "from": f"user_{i}", "to": f"recipient_{i}", "amount": i} 
@@ -85,12 +195,73 @@ class TestCryptoTree(unittest.TestCase):
             self.tree.insert(tx)
         
         # AVL should keep tree balanced
-        # We can't easily check height, but we can verify no crash and integrity
+        self.assertLessEqual(self.tree.root.height, 1.44 * math.log2(len(self.tree)))
         self.assertTrue(self.tree.verify_integrity())
         
         # Search should still be fast (no degeneration to O(n))
         result = self.tree.search("tx_50")
         self.assertIsNotNone(result)
         
+    def test_insert_many(self):
+        transactions = [{"id": f"tx_{i:04d}", "from": "A", "to": "B", "amount": i}
+                       for i in range(1000)]
+        random.shuffle(transactions)
+        
+        self.assertEqual(self.tree.insert_many(transactions + transactions[:10]), 1000)
+        self.assertEqual(len(self.tree), 1000)
+        self.assertEqual(self.tree.root.height, math.ceil(math.log2(1000 + 1)))
+        self.assertTrue(self.tree.verify_integrity())
+        self.assertEqual(self.tree.search("tx_0500")["amount"], 500)
+        self.assertEqual(self.tree.merkle_root, self.tree.root.hex_hash)
+        
+        # Non-empty tree falls back to per-item insert
+        self.assertEqual(self.tree.insert_many([transactions[0], {"id": "tx_9999"}]), 1)
+        self.assertEqual(len(self.tree), 1001)
+        self.assertTrue(self.tree.verify_integrity())
+
+    def test_jit_build_matches_python(self):
+        from array import array
+        from src.crypto_tree._jit import build_balanced, jit_build_balanced
+
+        n = 1000
+        expected = [array('i', [-1]) * n, array('i', [-1]) * n, array('b', [1]) * n]
+        actual = [array('i', [-1]) * n, array('i', [-1]) * n, array('b', [1]) * n]
+        root = build_balanced(*expected, 0, n)
+        self.assertEqual(jit_build_balanced()(*actual, 0, n), root)
+        self.assertEqual(actual, expected)
+
+    def test_parallel_hashing(self):
+        transactions = [{"id": f"tx_{i:04d}", "from": "A", "to": "B", "amount": i}
+                       for i in range(1000)]
+        self.tree.insert_many(transactions)
+        
+        parallel = CryptoBinaryTree()
+        parallel.insert_many(transactions, workers=4)
+        self.assertEqual(parallel.merkle_root, self.tree.merkle_root)
+        self.assertTrue(parallel.verify_integrity(workers=4))
+        
+        leaf = parallel._index["tx_0000"]
+        parallel._hashes[leaf * 32] ^= 0xFF
+        self.assertFalse(parallel.verify_integrity(workers=4))
+        
+    def test_c_kernel_matches_python(self):
+        try:
+            from src.crypto_tree._core import hash_rows
+        except ImportError:
+            self.skipTest("crypto_tree._core extension not built")
+        
+        for i in range(100):
+            self.tree.insert({"id": f"tx_{i:03d}", "memo": "é" * i})
+        rows = list(range(len(self.tree)))
+        with memoryview(self.tree._hashes) as hashes:
+            tree = self.tree
+            expected = b"".join(
+                hashlib.sha256(tree._hash_input(i, hashes)).digest() for i in rows
+            )
+            actual = hash_rows(
+                rows, tree._left, tree._right, tree._height, tree._tx_canon, hashes
+            )
+            self.assertEqual(actual, expected)
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file